@@ -1,26 +1,71 @@
 import sys
-import io
-import os
+import queue
 import keyword
 import re
 import subprocess
+import time
 import traceback
 import builtins
-from typing import List, Tuple, Dict, Set, Optional
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Tuple, Dict, Set, Optional, Deque, Pattern
 
 from PyQt5 import QtCore
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QRegExp, QSize, QTimer, QRect, QSettings
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer, QRect, QSettings, QDeadlineTimer
 from PyQt5.QtGui import QColor, QTextCharFormat, QFont, QPalette, QSyntaxHighlighter, QTextCursor, QIcon, QPainter, \
-    QTextFormat
+    QTextFormat, QTextBlockUserData
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
     QSplitter, QTextEdit, QPlainTextEdit, QFileDialog, QDialog,
     QLineEdit, QPushButton, QLabel, QMessageBox, QInputDialog,
-    QAction, QToolBar, QToolButton, QMenu, QCompleter, QListWidget, QListWidgetItem, QSizePolicy
+    QAction, QToolBar, QToolButton, QMenu, QCompleter, QListWidget, QSizePolicy
 )
 
 from bolt_ai import BoltAI  # Assuming this is an external dependency
 
+_MODULE_NAME_RE = re.compile(r"'([^']+)'")
+_FOLD_START_RE = re.compile(r'^(def|class|if|for|while|try:|with\s+)')
+_IDENTIFIER_RE = re.compile(r'\b[A-Za-z_]\w*')
+_KEYWORDS = frozenset(keyword.kwlist)
+_TRIPLE_QUOTE_RE = re.compile(r'"""|\'\'\'')
+_TRIPLE_QUOTE_STATES = {'"""': 1, "'''": 2}
+
+
+def _inside_string(text: str, idx: int, start: int = 0) -> bool:
+    """Whether text[idx] falls inside a quoted string opened at or after start"""
+    quote = None
+    i = start
+    while i < idx:
+        ch = text[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch == '"' or ch == "'":
+            quote = ch
+        i += 1
+    return quote is not None
+
+
+def _comment_start(text: str, start: int = 0) -> int:
+    idx = text.find('#', start)
+    while idx != -1 and _inside_string(text, idx, start):
+        idx = text.find('#', idx + 1)
+    return idx
+
+
+@lru_cache(maxsize=8)
+def _compile_source(source: str):
+    """Compile editor source once; the syntax check and Run share the result"""
+    return compile(source, '<editor>', 'exec')
+
+
+@lru_cache(maxsize=32)
+def _whole_word_pattern(search_text: str) -> Pattern[str]:
+    return re.compile(rf'\b{re.escape(search_text)}\b')
+
 
 class Config:
     """Centralized configuration constants"""
@@ -44,6 +89,20 @@ class Config:
     EDITOR_FONT = "Consolas"
     FONT_SIZE = 12
     AUTO_SAVE_INTERVAL = 30000
+    CONSOLE_FLUSH_INTERVAL = 16
+    CONSOLE_MAX_BLOCKS = 5000
+    CONSOLE_MAX_LINE_LENGTH = 2000
+    MAX_HIGHLIGHT_CHARS = 500_000
+    MAX_HIGHLIGHT_LINE_LENGTH = 2000
+    HIGHLIGHT_CACHE_SIZE = 4096
+    HIGHLIGHT_VIEW_MARGIN = 50
+    HIGHLIGHT_BATCH_SIZE = 200
+    HIGHLIGHT_IDLE_INTERVAL = 16
+    PANE_RESIZE_INTERVAL = 16
+    SHUTDOWN_TIMEOUT = 2000
+    SIDEBAR_WIDTH = 250
+    PIP_LIST_CACHE_TTL = 60
+    FIND_DEBOUNCE_INTERVAL = 200
     PYTHON_BUILTINS = dir(builtins)
     COMMON_IMPORTS = [
         "os", "sys", "math", "random", "datetime", "time", "json",
@@ -51,7 +110,7 @@ class Config:
         "requests", "numpy", "pandas", "matplotlib", "tkinter"
     ]
     AUTOCOMPLETE_TRIGGERS = [".", "im"]
-    DEFAULT_PROJECT_DIR = os.getcwd()
+    DEFAULT_PROJECT_DIR = Path.cwd()
 
     BUTTON_STYLE = """
         QToolButton {
@@ -164,9 +223,20 @@ class Config:
         }
     """
 
+class Icons:
+    """Process-wide icon cache so each image file is read from disk once"""
+    _icons: Dict[str, QIcon] = {}
+
+    @classmethod
+    def get(cls, path: str) -> QIcon:
+        if path not in cls._icons:
+            cls._icons[path] = QIcon(path)
+        return cls._icons[path]
+
 class HighlightRules:
     """Static syntax highlighting rules"""
     _formats: Dict[str, QTextCharFormat] = {}
+    _rules: Optional[List[Tuple[Pattern[str], QTextCharFormat, int]]] = None
 
     @classmethod
     def _create_format(cls, color: str, bold: bool = False) -> QTextCharFormat:
@@ -180,86 +250,279 @@ class HighlightRules:
         return cls._formats[key]
 
     @classmethod
-    def get_rules(cls) -> List[Tuple[QRegExp, QTextCharFormat]]:
+    def get_rules(cls) -> List[Tuple[Pattern[str], QTextCharFormat, int]]:
+        """Return (pattern, format, capture group to highlight) triples"""
+        if cls._rules is None:
+            cls._rules = cls._build_rules()
+        return cls._rules
+
+    @classmethod
+    def _build_rules(cls) -> List[Tuple[Pattern[str], QTextCharFormat, int]]:
         return [
-            (QRegExp('|'.join(r'\b' + kw + r'\b' for kw in keyword.kwlist)),
-             cls._create_format(Config.COLORS["keyword"], True)),
-            (QRegExp(r'"[^"\\]*(\\.[^"\\]*)*"'), cls._create_format(Config.COLORS["string"])),
-            (QRegExp(r"'[^'\\]*(\\.[^'\\]*)*'"), cls._create_format(Config.COLORS["string"])),
-            (QRegExp(r'#[^\n]*'), cls._create_format(Config.COLORS["comment"])),
-            (QRegExp(r'\b[0-9]+\.?[0-9]*\b'), cls._create_format(Config.COLORS["number"])),
-            (QRegExp(r'[\+\-\*/=<>!&|%^]+'), cls._create_format(Config.COLORS["operator"])),
-            (QRegExp(r'def\s+(\w+)\s*\('), cls._create_format(Config.COLORS["function"]))
+            (re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\''),
+             cls._create_format(Config.COLORS["string"]), 0),
+            (re.compile(r'\b[0-9]+\.?[0-9]*\b'), cls._create_format(Config.COLORS["number"]), 0),
+            (re.compile(r'[\+\-\*/=<>!&|%^]+'), cls._create_format(Config.COLORS["operator"]), 0)
         ]
 
+    @classmethod
+    def create_underline_format(cls, color: str, style: QTextCharFormat.UnderlineStyle) -> QTextCharFormat:
+        fmt = QTextCharFormat(cls._create_format(color))
+        fmt.setUnderlineStyle(style)
+        return fmt
+
+class _BlockFingerprint(QTextBlockUserData):
+    """Text hash and incoming string state a block was last scanned with, plus the state it left"""
+    def __init__(self, fingerprint: Tuple[int, int], state: int):
+        super().__init__()
+        self.fingerprint = fingerprint
+        self.state = state
+
 class PythonHighlighter(QSyntaxHighlighter):
     """Efficient Python syntax highlighter"""
-    def __init__(self, parent=None):
+    WARNING_PATTERNS = [
+        (re.compile(r'\bprint\s+[^(\n]'), "Old-style print statement"),
+        (re.compile(r'^\s*from\s+\w+\s+import\s+\*'), "Wildcard import detected"),
+        (re.compile(r'^(def|class|if|for|while)\s+\w+$'), "Missing colon")
+    ]
+
+    def __init__(self, parent=None, editor=None):
         super().__init__(parent)
+        self.editor = editor
         self.rules = HighlightRules.get_rules()
+        self.error_format = HighlightRules.create_underline_format(Config.COLORS["error"], QTextCharFormat.WaveUnderline)
+        self.warning_format = HighlightRules.create_underline_format(Config.COLORS["warning"],
+                                                                     QTextCharFormat.DashUnderline)
+        self.string_format = HighlightRules._create_format(Config.COLORS["string"])
+        self.comment_format = HighlightRules._create_format(Config.COLORS["comment"])
+        self.keyword_format = HighlightRules._create_format(Config.COLORS["keyword"], True)
+        self.function_format = HighlightRules._create_format(Config.COLORS["function"])
         self.errors: Dict[int, str] = {}
         self.warnings: Dict[int, str] = {}
         self._last_text = ""
+        self._last_block_count = 0
+        self._line_spans = lru_cache(maxsize=Config.HIGHLIGHT_CACHE_SIZE)(self._compute_spans)
+        self._pending: Dict[int, None] = {}
+        self._flushing = False
+        # Set while the highlighter itself restyles blocks, which Qt reports as a text change
+        self.reformatting = False
+        self._pending_timer = QTimer(self)
+        self._pending_timer.setInterval(Config.HIGHLIGHT_IDLE_INTERVAL)
+        self._pending_timer.timeout.connect(self._drain_pending)
+
+    def _view_range(self) -> Optional[Tuple[int, int]]:
+        """Block numbers on screen plus a margin, or None to format every block"""
+        editor = self.editor
+        if editor is None or self._flushing or not editor.isVisible():
+            return None
+        first = editor.firstVisibleBlock().blockNumber()
+        rows = editor.viewport().height() // max(editor.line_height, 1)
+        return first - Config.HIGHLIGHT_VIEW_MARGIN, first + rows + Config.HIGHLIGHT_VIEW_MARGIN
+
+    def rehighlight(self) -> None:
+        self._pending.clear()
+        self.reformatting = True
+        try:
+            super().rehighlight()
+        finally:
+            self.reformatting = False
+
+    def setDocument(self, document) -> None:
+        self.reformatting = True
+        try:
+            super().setDocument(document)
+        finally:
+            self.reformatting = False
+
+    def highlight_visible(self) -> None:
+        view = self._view_range()
+        if not self._pending or view is None:
+            return
+        self._rehighlight_pending([n for n in self._pending if view[0] <= n <= view[1]])
+
+    def _drain_pending(self) -> None:
+        self._rehighlight_pending(list(self._pending)[:Config.HIGHLIGHT_BATCH_SIZE])
+
+    def _rehighlight_pending(self, block_numbers: List[int]) -> None:
+        document = self.document()
+        if document is None:
+            self._pending.clear()
+        else:
+            self._flushing = self.reformatting = True
+            try:
+                for block_number in block_numbers:
+                    del self._pending[block_number]
+                    block = document.findBlockByNumber(block_number)
+                    if block.isValid():
+                        self.rehighlightBlock(block)
+            finally:
+                self._flushing = self.reformatting = False
+        if not self._pending:
+            self._pending_timer.stop()
+
+    def clear_cache(self) -> None:
+        self._line_spans.cache_clear()
+        self._line_warning.cache_clear()
+
+    def _compute_spans(self, text: str, state: int) -> Tuple[Tuple[Tuple[int, int, QTextCharFormat], ...], int]:
+        """Return the format spans for a line and the string state it leaves open"""
+        pos = 0
+        string_spans = []
+        if state:
+            delimiter = '"""' if state == 1 else "'''"
+            end = text.find(delimiter)
+            if end == -1:
+                return ((0, len(text), self.string_format),), state
+            pos = end + 3
+            string_spans.append((0, pos, self.string_format))
+            state = 0
+
+        comment_start = _comment_start(text, pos)
+        code_end = len(text) if comment_start == -1 else comment_start
+        spans = []
+        previous, previous_end = None, pos
+        for match in _IDENTIFIER_RE.finditer(text, pos, code_end):
+            word = match.group()
+            start, end = match.span()
+            if previous == "def" and text[previous_end:start].isspace():
+                spans.append((start, end - start, self.function_format))
+            elif word in _KEYWORDS:
+                spans.append((start, end - start, self.keyword_format))
+            previous, previous_end = word, end
+        for pattern, fmt, group in self.rules:
+            for match in pattern.finditer(text, pos, code_end):
+                start, end = match.span(group)
+                spans.append((start, end - start, fmt))
+
+        search = pos
+        while match := _TRIPLE_QUOTE_RE.search(text, search, code_end):
+            if _inside_string(text, match.start(), pos):
+                search = match.end()
+                continue
+            end = text.find(match.group(), match.end())
+            if end == -1:
+                string_spans.append((match.start(), len(text) - match.start(), self.string_format))
+                state = _TRIPLE_QUOTE_STATES[match.group()]
+                break
+            pos = search = end + 3
+            string_spans.append((match.start(), pos - match.start(), self.string_format))
+        else:
+            if comment_start != -1:
+                string_spans.append((comment_start, len(text) - comment_start, self.comment_format))
+        return tuple(spans + string_spans), state
 
     def update_full_code(self, full_text: str) -> None:
         if full_text != self._last_text:
             self._last_text = full_text
+            previous_errors = set(self.errors)
             self._check_full_syntax()
-            self.rehighlight()
+            document = self.document()
+            self.reformatting = True
+            try:
+                for line_number in previous_errors.symmetric_difference(self.errors):
+                    self.rehighlightBlock(document.findBlockByNumber(line_number))
+            finally:
+                self.reformatting = False
+
+    @staticmethod
+    def _shift_lines(lines: Dict[int, Any], line_number: int, delta: int) -> Dict[int, Any]:
+        """Renumber keys after delta lines were inserted (or removed) below line_number"""
+        shifted = {}
+        for key, value in lines.items():
+            if key <= line_number:
+                shifted[key] = value
+            elif key > line_number - delta:
+                shifted[key + delta] = value
+        return shifted
+
+    def _track_block_count(self, line_number: int) -> None:
+        # The first block reformatted after an edit is where lines were added or removed
+        block_count = self.document().blockCount()
+        delta = block_count - self._last_block_count
+        if delta:
+            self._last_block_count = block_count
+            self.errors = self._shift_lines(self.errors, line_number, delta)
+            self.warnings = self._shift_lines(self.warnings, line_number, delta)
+            self._pending = self._shift_lines(self._pending, line_number, delta)
 
     def _check_full_syntax(self) -> None:
         self.errors.clear()
         if not self._last_text.strip():
             return
         try:
-            compile(self._last_text, '<document>', 'exec')
+            _compile_source(self._last_text)
         except (SyntaxError, IndentationError) as e:
             if hasattr(e, 'lineno') and e.lineno is not None:
                 self.errors[e.lineno - 1] = str(e)
         except Exception as e:
             self.errors[0] = f"General error: {str(e)}"
 
-    def _check_warnings(self, text: str, line_number: int) -> None:
-        self.warnings.pop(line_number, None)
+    @classmethod
+    @lru_cache(maxsize=Config.HIGHLIGHT_CACHE_SIZE)
+    def _line_warning(cls, text: str) -> Optional[str]:
         stripped = text.strip()
         if not stripped or stripped.startswith('#'):
-            return
-        warning_patterns = [
-            (r'\bprint\s+[^(\n]', "Old-style print statement"),
-            (r'^\s*from\s+\w+\s+import\s+\*', "Wildcard import detected"),
-            (r'^(def|class|if|for|while)\s+\w+$', "Missing colon")
-        ]
-        for pattern, msg in warning_patterns:
-            if re.search(pattern, text):
-                self.warnings[line_number] = msg
-                break
+            return None
+        for pattern, msg in cls.WARNING_PATTERNS:
+            if pattern.search(text):
+                return msg
+        return None
+
+    def _check_warnings(self, text: str, line_number: int) -> None:
+        msg = self._line_warning(text)
+        if msg is None:
+            self.warnings.pop(line_number, None)
+        else:
+            self.warnings[line_number] = msg
 
     def highlightBlock(self, text: str) -> None:
-        for pattern, fmt in self.rules:
-            index = pattern.indexIn(text)
-            while index >= 0:
-                length = pattern.matchedLength()
-                if pattern.pattern().startswith('def\\s+'):
-                    func_index = index + 4
-                    func_length = len(pattern.capturedTexts()[1])
-                    self.setFormat(func_index, func_length, fmt)
+        if self.document().characterCount() > Config.MAX_HIGHLIGHT_CHARS:
+            # Runs before textChanged detaches the highlighter on a large load
+            return
+        line_number = self.currentBlock().blockNumber()
+        self._track_block_count(line_number)
+        state = max(self.previousBlockState(), 0)
+        if not text or text.isspace():
+            self.warnings.pop(line_number, None)
+            self.setCurrentBlockState(state)
+            return
+        view = self._view_range()
+        offscreen = view is not None and not view[0] <= line_number <= view[1]
+        if len(text) <= Config.MAX_HIGHLIGHT_LINE_LENGTH:
+            fingerprint = (hash(text), state)
+            data = self.currentBlockUserData()
+            if offscreen and isinstance(data, _BlockFingerprint) and data.fingerprint == fingerprint:
+                state = data.state
+            else:
+                spans, state = self._line_spans(text, state)
+                if not offscreen:
+                    for start, length, fmt in spans:
+                        self.setFormat(start, length, fmt)
+                if isinstance(data, _BlockFingerprint):
+                    data.fingerprint, data.state = fingerprint, state
                 else:
-                    self.setFormat(index, length, fmt)
-                index = pattern.indexIn(text, index + length)
+                    self.setCurrentBlockUserData(_BlockFingerprint(fingerprint, state))
+        self.setCurrentBlockState(state)
 
-        line_number = self.currentBlock().blockNumber()
         self._check_warnings(text, line_number)
+        if offscreen:
+            self._pending[line_number] = None
+            if not self._pending_timer.isActive():
+                self._pending_timer.start()
+            return
         if line_number in self.errors:
-            fmt = HighlightRules._create_format(Config.COLORS["error"])
-            fmt.setUnderlineStyle(QTextCharFormat.WaveUnderline)
-            self.setFormat(0, len(text), fmt)
+            self.setFormat(0, len(text), self.error_format)
         elif line_number in self.warnings:
-            fmt = HighlightRules._create_format(Config.COLORS["warning"])
-            fmt.setUnderlineStyle(QTextCharFormat.DashWaveUnderline)
-            self.setFormat(0, len(text), fmt)
+            self.setFormat(0, len(text), self.warning_format)
 
 class LineNumberArea(QWidget):
     """Optimized line number area"""
+    BG_COLOR = QColor(Config.COLORS["line_number_bg"])
+    FG_COLOR = QColor(Config.COLORS["line_number_fg"])
+    HOVER_COLOR = QColor(Config.COLORS["secondary_accent"])
+    FOLD_COLORS = {"def": QColor("#52585C"), "class": QColor("#61686D")}
+    FOLD_DEFAULT_COLOR = QColor("#71797E")
+    _number_text: List[str] = [""]
     def __init__(self, editor):
         super().__init__(editor)
         self.editor = editor
@@ -271,30 +534,38 @@ class LineNumberArea(QWidget):
 
     def paintEvent(self, event) -> None:
         painter = QPainter(self)
-        painter.fillRect(event.rect(), QColor(Config.COLORS["line_number_bg"]))
+        painter.fillRect(event.rect(), self.BG_COLOR)
         block = self.editor.firstVisibleBlock()
         top = int(self.editor.blockBoundingGeometry(block).translated(self.editor.contentOffset()).top())
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible():
+        line_height = self.editor.line_height
+        dirty_top, dirty_bottom = event.rect().top(), event.rect().bottom()
+        number_text = self._number_text
+
+        while block.isValid() and top <= dirty_bottom:
+            if block.isVisible() and top + line_height < dirty_top:
+                top += line_height
+            elif block.isVisible():
                 block_num = block.blockNumber()
-                painter.setPen(QColor(Config.COLORS["line_number_fg"]))
+                while len(number_text) <= block_num + 1:
+                    number_text.append(str(len(number_text)))
+                painter.setPen(self.FG_COLOR)
                 painter.drawText(
-                    QRect(5, top, self.width() - 5, self.editor.fontMetrics().height()),
-                    Qt.AlignLeft, str(block_num + 1)
+                    QRect(5, top, self.width() - 5, line_height),
+                    Qt.AlignLeft, number_text[block_num + 1]
                 )
                 if block_num in self.editor.foldable_lines:
-                    fold_type = self.editor.fold_types.get(block_num, "other")
-                    base_color = {"def": "#52585C", "class": "#61686D"}.get(fold_type, "#71797E")
-                    painter.setPen(
-                        QColor(base_color if block_num != self.hovered_line else Config.COLORS["secondary_accent"]))
+                    if block_num == self.hovered_line:
+                        painter.setPen(self.HOVER_COLOR)
+                    else:
+                        fold_type = self.editor.fold_types.get(block_num, "other")
+                        painter.setPen(self.FOLD_COLORS.get(fold_type, self.FOLD_DEFAULT_COLOR))
                     arrow = "▼" if block_num not in self.editor.folded_blocks else "▶"
                     painter.drawText(
-                        QRect(self.width() - 20, top, 15, self.editor.fontMetrics().height()),
+                        QRect(self.width() - 20, top, 15, line_height),
                         Qt.AlignRight, arrow
                     )
+                top += line_height
             block = block.next()
-            top += int(self.editor.blockBoundingRect(block).height())
 
     def mouseMoveEvent(self, event) -> None:
         block = self.editor.cursorForPosition(event.pos()).block()
@@ -314,17 +585,27 @@ class LineNumberArea(QWidget):
 
 class CodeEditor(QPlainTextEdit):
     """Optimized code editor"""
+    # textChanged minus the emissions caused by the highlighter restyling blocks
+    source_changed = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.ide_parent = parent if isinstance(parent, PythonIDE) else None
         self.line_number_area = LineNumberArea(self)
-        self.highlighter = PythonHighlighter(self.document())
+        self.highlighter = PythonHighlighter(self.document(), self)
         self.foldable_lines: Set[int] = set()
         self.folded_blocks: Set[int] = set()
         self.fold_ranges: Dict[int, int] = {}
         self.fold_types: Dict[int, str] = {}
         self.completer = None
         self._autocomplete_active = False
+        self._line_number_digits = 0
+        self._line_number_width = 0
+        self._viewport_margin = -1
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(Config.PANE_RESIZE_INTERVAL)
+        self._resize_timer.timeout.connect(self.highlighter.highlight_visible)
         self._setup_ui()
         self._setup_autocomplete()
 
@@ -345,24 +626,60 @@ class CodeEditor(QPlainTextEdit):
                 selection-color: {Config.COLORS["background"]};
             }}
         """)
-        self.setTabStopWidth(self.fontMetrics().width(' ') * 4)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
         self.blockCountChanged.connect(self.update_line_number_area_width)
         self.updateRequest.connect(self.update_line_number_area)
+        self.verticalScrollBar().valueChanged.connect(self.highlighter.highlight_visible)
         self.cursorPositionChanged.connect(self.highlight_current_line)
-        self.textChanged.connect(self._on_text_changed)
+        self.textChanged.connect(self._emit_source_changed)
+        self.source_changed.connect(self._on_text_changed)
         self.setAcceptDrops(True)
 
+    def _emit_source_changed(self) -> None:
+        if not self.highlighter.reformatting:
+            self.source_changed.emit()
+
     def _on_text_changed(self) -> None:
-        self.highlighter.update_full_code(self.toPlainText())
+        document = self.document()
+        if document.characterCount() > Config.MAX_HIGHLIGHT_CHARS:
+            if self.highlighter.document() is not None:
+                self.highlighter.setDocument(None)
+                self.highlighter.errors.clear()
+                self.highlighter.warnings.clear()
+        else:
+            if self.highlighter.document() is None:
+                self.highlighter.setDocument(document)
+            self.highlighter.update_full_code(self.toPlainText())
         self.detect_foldable_lines()
         if self.ide_parent:
             self.ide_parent.update_error_warning_count()
 
-    def line_number_area_width(self) -> int:
-        return 40 + self.fontMetrics().width('9') * max(1, len(str(self.blockCount())))
+    def setFont(self, font: QFont) -> None:
+        super().setFont(font)
+        metrics = self.fontMetrics()
+        self.line_height = metrics.lineSpacing()
+        self.digit_width = metrics.width('9')
+        self.setTabStopDistance(metrics.width(' ') * 4)
+        self._line_number_digits = 0
+        self.update_line_number_area_width()
 
-    def update_line_number_area_width(self) -> None:
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+    def line_number_area_width(self) -> int:
+        return self._line_number_width
+
+    def update_line_number_area_width(self, block_count: Optional[int] = None) -> None:
+        if block_count is None:
+            block_count = self.blockCount()
+        digits, limit = 1, 10
+        while block_count >= limit:
+            digits += 1
+            limit *= 10
+        if digits != self._line_number_digits:
+            self._line_number_digits = digits
+            self._line_number_width = 40 + self.digit_width * digits
+        width = self._line_number_width
+        if width != self._viewport_margin:
+            self._viewport_margin = width
+            self.setViewportMargins(width, 0, 0, 0)
 
     def update_line_number_area(self, rect: QRect, dy: int) -> None:
         if dy:
@@ -373,6 +690,9 @@ class CodeEditor(QPlainTextEdit):
     def resizeEvent(self, event) -> None:
         super().resizeEvent(event)
         self.line_number_area.setGeometry(0, 0, self.line_number_area_width(), self.contentsRect().height())
+        # Splitter drags resize on every pixel; format newly exposed blocks once the size settles
+        if not self._resize_timer.isActive():
+            self._resize_timer.start()
 
     def highlight_current_line(self) -> None:
         if not self.isReadOnly():
@@ -399,7 +719,7 @@ class CodeEditor(QPlainTextEdit):
                     start_line, _, block_type = indent_stack.pop()
                     if current_line - start_line > 1:
                         self._add_foldable(start_line, current_line - 1, block_type)
-                if re.match(r'^(def|class|if|for|while|try:|with\s+)', text):
+                if _FOLD_START_RE.match(text):
                     block_type = "def" if text.startswith("def ") else "class" if text.startswith("class ") else "other"
                     indent_stack.append((current_line, current_indent, block_type))
             block = block.next()
@@ -559,22 +879,29 @@ class CodeEditor(QPlainTextEdit):
             if file_path.endswith('.py'):
                 try:
                     with open(file_path, 'r', encoding="utf-8") as f:
+                        self.highlighter.clear_cache()
                         self.setPlainText(f.read())
-                    self.ide_parent.current_file = file_path
+                    self.ide_parent.current_file = Path(file_path)
                     self.ide_parent._mark_saved()
                     self.ide_parent.console.write(f"\n[Opened] {file_path}\n")
                 except Exception as e:
                     self.ide_parent.console.write(f"Error opening file: {str(e)}\n")
         event.acceptProposedAction()
 
-class ConsoleWidget(QTextEdit):
+class ConsoleWidget(QPlainTextEdit):
     """Efficient console widget"""
+    _flush_requested = pyqtSignal()
+    input_submitted = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._setup_ui()
         self.input_buffer = ""
         self.reading_input = False
         self.input_pos = 0
+        self._write_buffer: Deque[str] = deque()
+        self._flush_pending = False
+        self._flush_requested.connect(self._schedule_flush, Qt.QueuedConnection)
 
     def _setup_ui(self) -> None:
         font = QFont(Config.EDITOR_FONT, Config.FONT_SIZE)
@@ -585,7 +912,7 @@ class ConsoleWidget(QTextEdit):
         palette.setColor(QPalette.Text, QColor(Config.COLORS["text"]))
         self.setPalette(palette)
         self.setStyleSheet(f"""
-            QTextEdit {{
+            QPlainTextEdit {{
                 border: 1px solid {Config.COLORS["secondary_bg"]};
                 border-radius: 6px;
                 padding: 4px;
@@ -594,24 +921,49 @@ class ConsoleWidget(QTextEdit):
             }}
         """)
         self.setReadOnly(True)
+        self.setMaximumBlockCount(Config.CONSOLE_MAX_BLOCKS)
 
     def write(self, text: str) -> None:
-        self.moveCursor(QTextCursor.End)
-        self.insertPlainText(text)
-        QApplication.processEvents()
+        self._write_buffer.append(text)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self._flush_requested.emit()
+
+    def flush(self) -> None:
+        if QThread.currentThread() is self.thread():
+            self._flush_buffer()
+
+    def clear(self) -> None:
+        self._write_buffer.clear()
+        super().clear()
+
+    def _schedule_flush(self) -> None:
+        QTimer.singleShot(Config.CONSOLE_FLUSH_INTERVAL, self._flush_buffer)
+
+    def _flush_buffer(self) -> None:
+        self._flush_pending = False
+        chunks = []
+        while self._write_buffer:
+            chunks.append(self._write_buffer.popleft())
+        if chunks:
+            self.moveCursor(QTextCursor.End)
+            self.insertPlainText(self._crop_long_lines("".join(chunks)))
+
+    @staticmethod
+    def _crop_long_lines(text: str) -> str:
+        limit = Config.CONSOLE_MAX_LINE_LENGTH
+        if len(text) <= limit:
+            return text
+        return '\n'.join(line if len(line) <= limit else line[:limit] + " …"
+                         for line in text.split('\n'))
 
     def start_input(self) -> None:
+        self._flush_buffer()
         self.reading_input = True
         self.setReadOnly(False)
         self.moveCursor(QTextCursor.End)
         self.input_pos = self.textCursor().position()
 
-    def readline(self) -> str:
-        self.start_input()
-        while self.reading_input:
-            QApplication.processEvents()
-        return self.input_buffer + '\n'
-
     def keyPressEvent(self, event) -> None:
         if not self.reading_input:
             if event.key() == Qt.Key_C and event.modifiers() & Qt.ControlModifier:
@@ -628,6 +980,7 @@ class ConsoleWidget(QTextEdit):
             self.insertPlainText('\n')
             self.reading_input = False
             self.setReadOnly(True)
+            self.input_submitted.emit(self.input_buffer)
             return
         if event.key() == Qt.Key_Left and cursor.position() <= self.input_pos:
             return
@@ -637,73 +990,126 @@ class ConsoleWidget(QTextEdit):
             return
         super().keyPressEvent(event)
 
+class _ConsoleBuffer:
+    """Line-buffered stdout writer that hands whole lines to a sink callable"""
+    LIMIT = 4096
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.buf: List[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.buf.append(text)
+        self.size += len(text)
+        if '\n' in text or self.size > self.LIMIT:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self.buf:
+            self.sink(''.join(self.buf))
+            self.buf.clear()
+            self.size = 0
+
+class _ConsoleInput:
+    """stdin shim that asks the GUI for a line and blocks until one is submitted"""
+    def __init__(self, lines: queue.Queue, request_input):
+        self.lines = lines
+        self.request_input = request_input
+
+    def readline(self) -> str:
+        sys.stdout.flush()
+        self.request_input()
+        return self.lines.get()
+
 class PythonInterpreter(QThread):
     """Thread for executing Python code"""
     output_ready = pyqtSignal(str)
+    input_requested = pyqtSignal()
     error_detected = pyqtSignal(str)
     finished = pyqtSignal()
 
-    def __init__(self, code: str, console: ConsoleWidget):
+    def __init__(self):
         super().__init__()
+        self.code = ""
+        self.input_lines: queue.Queue = queue.Queue()
+        self._running = True
+
+    def execute(self, code: str) -> None:
+        """Run code on this thread, reusing the object and its connections"""
         self.code = code
-        self.console = console
+        self.input_lines = queue.Queue()
         self._running = True
+        self.start()
+
+    def submit_input(self, text: str) -> None:
+        self.input_lines.put(text + '\n')
 
     def run(self) -> None:
         if not self._running:
             return
         stdout, stderr, stdin = sys.stdout, sys.stderr, sys.stdin
-        captured_output = io.StringIO()
+        buffered_stdout = _ConsoleBuffer(self.output_ready.emit)
+        buffered_stderr = _ConsoleBuffer(self.output_ready.emit)
         try:
-            sys.stdout = self.console
-            sys.stderr = captured_output
-            sys.stdin = self.console
-            exec(self.code, {'__name__': '__main__'})
+            sys.stdout = buffered_stdout
+            sys.stderr = buffered_stderr
+            sys.stdin = _ConsoleInput(self.input_lines, self.input_requested.emit)
+            exec(_compile_source(self.code), {'__name__': '__main__'})
         except ModuleNotFoundError as e:
-            module = str(e).split("'")[1] if "'" in str(e) else str(e)
+            match = _MODULE_NAME_RE.search(str(e))
+            module = match.group(1) if match else str(e)
             self.error_detected.emit(module)
-            self.console.write(f"{str(e)}\n")
-            traceback.print_exc(file=self.console)
+            buffered_stdout.write(f"{str(e)}\n")
+            traceback.print_exc(file=buffered_stdout)
         except Exception as e:
-            traceback.print_exc(file=self.console)
+            traceback.print_exc(file=buffered_stdout)
         finally:
-            if error_output := captured_output.getvalue():
-                self.console.write(error_output)
+            buffered_stdout.flush()
+            buffered_stderr.flush()
             sys.stdout, sys.stderr, sys.stdin = stdout, stderr, stdin
-            captured_output.close()
             if self._running:
                 self.finished.emit()
 
-    def stop(self) -> None:
+    def stop(self, timeout_ms: Optional[int] = None) -> None:
         self._running = False
         self.terminate()
-        self.wait()
+        if timeout_ms is None:
+            self.wait()
+        else:
+            self.wait(max(timeout_ms, 0))
 
 class PackageInstaller(QThread):
     """Thread for installing packages"""
     output_ready = pyqtSignal(str)
     finished = pyqtSignal(bool)
 
-    def __init__(self, package_name: str, console: ConsoleWidget):
+    def __init__(self):
         super().__init__()
+        self.package_name = ""
+        self.process: Optional[subprocess.Popen] = None
+        self._running = True
+
+    def install(self, package_name: str) -> None:
         self.package_name = package_name
-        self.console = console
         self._running = True
+        self.start()
 
     def run(self) -> None:
         if not self._running:
             return
         try:
             self.output_ready.emit(f"Installing {self.package_name}...\n")
-            process = subprocess.Popen(
-                [sys.executable, "-m", "pip", "install", self.package_name],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            self.process = subprocess.Popen(
+                [sys.executable, "-u", "-m", "pip", "install", "--progress-bar", "off", self.package_name],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
             )
-            stdout, stderr = process.communicate()
-            success = process.returncode == 0
+            for line in iter(self.process.stdout.readline, ''):
+                self.output_ready.emit(line)
+            success = self.process.wait() == 0
             self.output_ready.emit(
-                f"{'Successfully installed' if success else 'Failed to install'} "
-                f"{self.package_name}:\n{stdout if success else stderr}\n"
+                f"{'Successfully installed' if success else 'Failed to install'} {self.package_name}\n"
             )
             if self._running:
                 self.finished.emit(success)
@@ -711,29 +1117,44 @@ class PackageInstaller(QThread):
             self.output_ready.emit(f"Error: {str(e)}\n")
             self.finished.emit(False)
 
-    def stop(self) -> None:
+    def stop(self, timeout_ms: Optional[int] = None) -> None:
         self._running = False
+        deadline = None if timeout_ms is None else QDeadlineTimer(max(timeout_ms, 0))
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(None if deadline is None else deadline.remainingTime() / 1000)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
         self.terminate()
-        self.wait()
+        if deadline is None:
+            self.wait()
+        else:
+            self.wait(deadline.remainingTime())
 
 class PythonIDE(QMainWindow):
     """Main IDE window"""
     def __init__(self):
         super().__init__()
-        self.current_file: Optional[str] = None
+        self.current_file: Optional[Path] = None
         self.code_is_running = False
         self.child_windows: List['PythonIDE'] = []
-        self.project_dir = Config.DEFAULT_PROJECT_DIR
+        self._shut_down = False
         self.settings = QSettings("xAI", "JaxPY")
-        self.project_dir = self.settings.value("project_dir", Config.DEFAULT_PROJECT_DIR, type=str)
+        self.project_dir = Path(self.settings.value("project_dir", str(Config.DEFAULT_PROJECT_DIR), type=str))
         self.interpreter: Optional[PythonInterpreter] = None
         self.installer: Optional[PackageInstaller] = None
         self.sidebar: Optional[Sidebar] = None
+        self._find_dialog: Optional[QDialog] = None
+        self._pkg_dialog: Optional[QDialog] = None
+        self._pip_list_cache: Optional[List[str]] = None
+        self._pip_list_time = 0.0
+        self._pip_list_lower: List[str] = []
         self._init_ui()
 
     def _init_ui(self) -> None:
         self.setWindowTitle("JaxPY")
-        self.setWindowIcon(QIcon("JaxPY.ico"))
+        self.setWindowIcon(Icons.get("JaxPY.ico"))
         self.setGeometry(100, 100, 1000, 800)
 
         toolbar = QToolBar()
@@ -749,7 +1170,7 @@ class PythonIDE(QMainWindow):
         self.addToolBar(Qt.TopToolBarArea, toolbar)
 
         logo_label = QLabel()
-        logo_label.setPixmap(QIcon("JaxPY.ico").pixmap(40, 40))
+        logo_label.setPixmap(Icons.get("JaxPY.ico").pixmap(40, 40))
         logo_label.setStyleSheet("padding: 4px; border: none;")
         toolbar.addWidget(logo_label)
 
@@ -806,7 +1227,7 @@ class PythonIDE(QMainWindow):
         toolbar.addWidget(spacer)
 
         self.run_button = QToolButton()
-        self.run_button.setIcon(QIcon("images/play_green.png"))
+        self.run_button.setIcon(Icons.get("images/play_green.png"))
         self.run_button.setIconSize(QSize(24, 24))
         self.run_button.setShortcut("F5")
         self.run_button.clicked.connect(self.run_code)
@@ -815,7 +1236,7 @@ class PythonIDE(QMainWindow):
         toolbar.addWidget(self.run_button)
 
         self.stop_button = QToolButton()
-        self.stop_button.setIcon(QIcon("images/stop.png"))
+        self.stop_button.setIcon(Icons.get("images/stop.png"))
         self.stop_button.setIconSize(QSize(24, 24))
         self.stop_button.clicked.connect(self.stop_code)
         self.stop_button.setStyleSheet(Config.STOP_BUTTON_STYLE)  # Fixed reference
@@ -838,7 +1259,7 @@ class PythonIDE(QMainWindow):
         toggle_layout.addStretch()
 
         self.error_icon_label = QLabel()
-        self.error_icon_label.setPixmap(QIcon("images/error.png").pixmap(24, 24))
+        self.error_icon_label.setPixmap(Icons.get("images/error.png").pixmap(24, 24))
         self.error_icon_label.setStyleSheet(f"""
             background: {Config.COLORS["secondary_bg"]};
             padding: 4px;
@@ -857,7 +1278,7 @@ class PythonIDE(QMainWindow):
         toggle_layout.addWidget(self.error_count_label)
 
         self.warning_icon_label = QLabel()
-        self.warning_icon_label.setPixmap(QIcon("images/warning.png").pixmap(24, 24))
+        self.warning_icon_label.setPixmap(Icons.get("images/warning.png").pixmap(24, 24))
         self.warning_icon_label.setStyleSheet(f"""
             background: {Config.COLORS["secondary_bg"]};
             padding: 4px;
@@ -889,18 +1310,12 @@ class PythonIDE(QMainWindow):
                 background: {Config.COLORS["secondary_bg"]};
                 width: 4px;
             }}
-            QSplitter::多元handle:hover {{
+            QSplitter::handle:hover {{
                 background: {Config.COLORS["secondary_accent"]};
             }}
         """)
-        self.sidebar_content = QWidget()
-        sidebar_layout = QVBoxLayout(self.sidebar_content)
-        sidebar_layout.setContentsMargins(4, 4, 4, 4)
-        self.bolt_ai = BoltAI(self)
-        sidebar_layout.addWidget(self.bolt_ai)
-        self.sidebar_content.setMinimumWidth(250)
-        self.sidebar_content.setVisible(False)
-        content_splitter.addWidget(self.sidebar_content)
+        self.sidebar_content: Optional[QWidget] = None
+        self.bolt_ai: Optional[BoltAI] = None
 
         editor_console_splitter = QSplitter(Qt.Vertical)
         editor_console_splitter.setStyleSheet(f"""
@@ -913,7 +1328,7 @@ class PythonIDE(QMainWindow):
             }}
         """)
         self.code_editor = CodeEditor(self)
-        self.code_editor.textChanged.connect(self._mark_unsaved)
+        self.code_editor.source_changed.connect(self._mark_unsaved)
         editor_console_splitter.addWidget(self.code_editor)
 
         console_container = QWidget()
@@ -954,13 +1369,14 @@ class PythonIDE(QMainWindow):
 
         console_layout.addLayout(header)
         self.console = ConsoleWidget()
+        self.console.input_submitted.connect(self._submit_console_input)
         console_layout.addWidget(self.console)
         editor_console_splitter.addWidget(console_container)
         editor_console_splitter.setSizes([600, 200])
 
         content_splitter.addWidget(editor_console_splitter)
-        content_splitter.setSizes([0, 1000])
         main_layout.addWidget(content_splitter)
+        self.content_splitter = content_splitter
 
         self._setup_auto_save()
         self.code_editor.setPlainText(
@@ -1005,16 +1421,25 @@ class PythonIDE(QMainWindow):
             }}
         """)
 
+    def _build_sidebar(self) -> None:
+        self.sidebar_content = QWidget()
+        sidebar_layout = QVBoxLayout(self.sidebar_content)
+        sidebar_layout.setContentsMargins(4, 4, 4, 4)
+        self.bolt_ai = BoltAI(self)
+        sidebar_layout.addWidget(self.bolt_ai)
+        self.sidebar_content.setMinimumWidth(Config.SIDEBAR_WIDTH)
+        self.content_splitter.insertWidget(0, self.sidebar_content)
+
     def _setup_auto_save(self) -> None:
         self.auto_save_timer = QTimer(self)
         self.auto_save_timer.timeout.connect(self.auto_save)
         self.auto_save_timer.start(Config.AUTO_SAVE_INTERVAL)
 
     def set_project_directory(self) -> None:
-        dir_path = QFileDialog.getExistingDirectory(self, "Select Project Directory", self.project_dir)
+        dir_path = QFileDialog.getExistingDirectory(self, "Select Project Directory", str(self.project_dir))
         if dir_path:
-            self.project_dir = dir_path
-            self.settings.setValue("project_dir", self.project_dir)
+            self.project_dir = Path(dir_path)
+            self.settings.setValue("project_dir", str(self.project_dir))
             self.console.write(f"\n[Project Directory Set] {self.project_dir}\n")
 
     def run_code(self) -> None:
@@ -1024,14 +1449,17 @@ class PythonIDE(QMainWindow):
 
         self.code_is_running = True
         self.run_button.setEnabled(False)
-        self.run_button.setIcon(QIcon("images/run.png"))
+        self.run_button.setIcon(Icons.get("images/run.png"))
         self.run_button.setStyleSheet(Config.RUN_BUTTON_RUNNING_STYLE)  # Fixed reference
         self.console.clear()
 
-        self.interpreter = PythonInterpreter(self.code_editor.toPlainText(), self.console)
-        self.interpreter.finished.connect(self._on_execution_finished)
-        self.interpreter.error_detected.connect(self._handle_module_error)
-        self.interpreter.start()
+        if self.interpreter is None:
+            self.interpreter = PythonInterpreter()
+            self.interpreter.output_ready.connect(self.console.write, Qt.QueuedConnection)
+            self.interpreter.input_requested.connect(self.console.start_input, Qt.QueuedConnection)
+            self.interpreter.finished.connect(self._on_execution_finished)
+            self.interpreter.error_detected.connect(self._handle_module_error)
+        self.interpreter.execute(self.code_editor.toPlainText())
 
     def stop_code(self) -> None:
         if not self.code_is_running:
@@ -1044,17 +1472,19 @@ class PythonIDE(QMainWindow):
         self.console.clear()
 
     def _on_execution_finished(self) -> None:
+        self.console.flush()
         self.console.write("\n[Execution finished]\n>>> ")
         self._reset_execution_state()
 
     def _reset_execution_state(self) -> None:
         self.code_is_running = False
         self.run_button.setEnabled(True)
-        self.run_button.setIcon(QIcon("images/play_green.png"))
+        self.run_button.setIcon(Icons.get("images/play_green.png"))
         self.run_button.setStyleSheet(Config.RUN_BUTTON_NOT_RUNNING_STYLE)  # Fixed reference
-        if self.interpreter:
-            self.interpreter.deleteLater()
-            self.interpreter = None
+
+    def _submit_console_input(self, text: str) -> None:
+        if self.interpreter and self.interpreter.isRunning():
+            self.interpreter.submit_input(text)
 
     def _handle_module_error(self, module_name: str) -> None:
         self.console.write(f"\n[Module Error] {module_name} not found.\n")
@@ -1074,22 +1504,23 @@ class PythonIDE(QMainWindow):
         if filename:
             try:
                 with open(filename, 'r', encoding="utf-8") as f:
+                    self.code_editor.highlighter.clear_cache()
                     self.code_editor.setPlainText(f.read())
-                self.current_file = filename
+                self.current_file = Path(filename)
                 self._mark_saved()
             except Exception as e:
                 self.console.write(f"Error opening file: {str(e)}\n")
 
     def save_file(self) -> None:
         if not self.current_file:
-            self.current_file, _ = QFileDialog.getSaveFileName(self, "Save Python File", "", "Python Files (*.py)")
+            filename, _ = QFileDialog.getSaveFileName(self, "Save Python File", "", "Python Files (*.py)")
+            self.current_file = Path(filename) if filename else None
         if self.current_file:
             self._save_to_file(self.current_file)
 
-    def _save_to_file(self, path: str, silent: bool = False) -> None:
+    def _save_to_file(self, path: Path, silent: bool = False) -> None:
         try:
-            with open(path, 'w', encoding="utf-8") as f:
-                f.write(self.code_editor.toPlainText())
+            path.write_text(self.code_editor.toPlainText(), encoding="utf-8")
             if not silent:
                 self.console.write(f"\n[Saved] {path}\n")
             self._mark_saved()
@@ -1101,7 +1532,7 @@ class PythonIDE(QMainWindow):
             self._save_to_file(self.current_file, silent=True)
 
     def _mark_unsaved(self) -> None:
-        self.save_status_dot.setPixmap(QIcon("images/unsaved.png").pixmap(16, 16))
+        self.save_status_dot.setPixmap(Icons.get("images/unsaved.png").pixmap(16, 16))
         self.save_status_dot.setStyleSheet(f"""
             color: {Config.COLORS["error"]};
             background: {Config.COLORS["secondary_bg"]};
@@ -1112,7 +1543,7 @@ class PythonIDE(QMainWindow):
         self.save_status_dot.setToolTip("File has unsaved changes")
 
     def _mark_saved(self) -> None:
-        self.save_status_dot.setPixmap(QIcon("images/saved.png").pixmap(16, 16))
+        self.save_status_dot.setPixmap(Icons.get("images/saved.png").pixmap(16, 16))
         self.save_status_dot.setStyleSheet(f"""
             color: {Config.COLORS["accent"]};
             background: {Config.COLORS["secondary_bg"]};
@@ -1125,12 +1556,23 @@ class PythonIDE(QMainWindow):
     def new_window(self) -> None:
         try:
             new_ide = PythonIDE()
+            new_ide.setAttribute(Qt.WA_DeleteOnClose)
+            new_ide.destroyed.connect(lambda: self._forget_child_window(new_ide))
             self.child_windows.append(new_ide)
             new_ide.show()
         except Exception as e:
             self.console.write(f"Failed to open new window: {str(e)}\n")
 
+    def _forget_child_window(self, window: 'PythonIDE') -> None:
+        if window in self.child_windows:
+            self.child_windows.remove(window)
+
     def find_and_replace(self) -> None:
+        if self._find_dialog is None:
+            self._find_dialog = self._build_find_dialog()
+        self._find_dialog.exec_()
+
+    def _build_find_dialog(self) -> QDialog:
         dialog = QDialog(self)
         dialog.setWindowTitle("Find and Replace")
         dialog.setGeometry(300, 300, 350, 150)
@@ -1161,10 +1603,19 @@ class PythonIDE(QMainWindow):
         """)
         match_positions: List[int] = []
         self.current_match_index = -1
+        self._find_query: Optional[str] = None
+        self.code_editor.source_changed.connect(self._invalidate_find_results)
+
+        search_timer = QTimer(dialog)
+        search_timer.setSingleShot(True)
+        search_timer.setInterval(Config.FIND_DEBOUNCE_INTERVAL)
+        search_timer.timeout.connect(lambda: self._find_text(find_input, match_label, match_positions))
+        find_input.textChanged.connect(lambda _: search_timer.start())
 
-        layout.addWidget(QLabel("Find:", styleSheet=f"color: {Config.COLORS["text"]}; font-family: {Config.EDITOR_FONT};"))
+        label_style = f"color: {Config.COLORS['text']}; font-family: {Config.EDITOR_FONT};"
+        layout.addWidget(QLabel("Find:", styleSheet=label_style))
         layout.addWidget(find_input)
-        layout.addWidget(QLabel("Replace:", styleSheet=f"color: {Config.COLORS["text"]}; font-family: {Config.EDITOR_FONT};"))
+        layout.addWidget(QLabel("Replace:", styleSheet=label_style))
         layout.addWidget(replace_input)
 
         match_layout = QHBoxLayout()
@@ -1181,34 +1632,38 @@ class PythonIDE(QMainWindow):
         for text, callback in [
             ("Find", lambda: self._find_text(find_input, match_label, match_positions)),
             ("Replace", lambda: self._replace_text(find_input, replace_input, match_positions, match_label)),
-            ("Replace All", lambda: self._replace_all_text(find_input, replace_input, dialog))
+            ("Replace All", lambda: self._replace_all_text(find_input, replace_input, match_positions, match_label,
+                                                           dialog))
         ]:
             btn = QPushButton(text)
             btn.setStyleSheet(Config.BUTTON_STYLE)
             btn.clicked.connect(callback)
             layout.addWidget(btn)
 
-        dialog.exec_()
+        return dialog
 
     def _find_text(self, find_input: QLineEdit, match_label: QLabel, match_positions: List[int]) -> None:
         search_text = find_input.text().strip()
         if not search_text:
             return
-        document = self.code_editor.document()
-        cursor = QTextCursor(document)
-        match_positions.clear()
-        regex = QRegExp(rf'\b{re.escape(search_text)}\b')
-        while not cursor.isNull() and not cursor.atEnd():
-            cursor = document.find(regex, cursor)
-            if cursor.isNull():
-                break
-            match_positions.append(cursor.position())
+        if search_text != self._find_query:
+            pattern = _whole_word_pattern(search_text)
+            match_positions.clear()
+            block = self.code_editor.document().firstBlock()
+            while block.isValid():
+                offset = block.position()
+                match_positions.extend(offset + match.end() for match in pattern.finditer(block.text()))
+                block = block.next()
+            self._find_query = search_text
         match_count = len(match_positions)
         match_label.setText(f"Matches: {match_count}")
         if match_count:
             self.current_match_index = 0
             self._highlight_match(match_positions, match_label, find_input)
 
+    def _invalidate_find_results(self) -> None:
+        self._find_query = None
+
     def _highlight_match(self, match_positions: List[int], match_label: QLabel, find_input: QLineEdit) -> None:
         if self.current_match_index >= 0 and match_positions:
             cursor = self.code_editor.textCursor()
@@ -1239,22 +1694,23 @@ class PythonIDE(QMainWindow):
                 match_positions[self.current_match_index] += len(replace_text) - len(search_text)
             self._find_text(find_input, match_label, match_positions)
 
-    def _replace_all_text(self, find_input: QLineEdit, replace_input: QLineEdit, dialog: QDialog) -> None:
+    def _replace_all_text(self, find_input: QLineEdit, replace_input: QLineEdit, match_positions: List[int],
+                          match_label: QLabel, dialog: QDialog) -> None:
         search_text = find_input.text().strip()
         replace_text = replace_input.text()
         if not search_text:
             return
-        document = self.code_editor.document()
-        cursor = QTextCursor(document)
-        cursor.beginEditBlock()
-        regex = QRegExp(rf'\b{re.escape(search_text)}\b')
-        cursor.movePosition(QTextCursor.Start)
-        while True:
-            cursor = document.find(regex, cursor)
-            if cursor.isNull():
-                break
-            cursor.insertText(replace_text)
-        cursor.endEditBlock()
+        pattern = _whole_word_pattern(search_text)
+        new_text, count = pattern.subn(lambda _: replace_text, self.code_editor.toPlainText())
+        if count:
+            cursor = QTextCursor(self.code_editor.document())
+            cursor.beginEditBlock()
+            cursor.select(QTextCursor.Document)
+            cursor.insertText(new_text)
+            cursor.endEditBlock()
+        match_positions.clear()
+        self.current_match_index = -1
+        match_label.setText("Matches: 0")
         dialog.accept()
 
     def show_package_installer(self) -> None:
@@ -1263,81 +1719,103 @@ class PythonIDE(QMainWindow):
             self.install_package(package_name)
 
     def show_installed_packages(self) -> None:
-        try:
-            result = subprocess.run([sys.executable, "-m", "pip", "list"], capture_output=True, text=True, check=True)
-            packages = result.stdout.split("\n")[2:]
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Installed Packages")
-            dialog.setGeometry(200, 200, 400, 400)
-            layout = QVBoxLayout(dialog)
-            layout.setSpacing(6)
-
-            search_bar = QLineEdit()
-            search_bar.setPlaceholderText("Search packages...")
-            search_bar.setStyleSheet(f"""
+        if self._pip_list_cache is None or time.monotonic() - self._pip_list_time > Config.PIP_LIST_CACHE_TTL:
+            try:
+                result = subprocess.run([sys.executable, "-m", "pip", "list"],
+                                        capture_output=True, text=True, check=True)
+            except subprocess.CalledProcessError as e:
+                QMessageBox.warning(self, "Error", f"Failed to list packages: {str(e)}")
+                return
+            self._pip_list_cache = [pkg.strip() for pkg in result.stdout.split("\n")[2:] if pkg.strip()]
+            self._pip_list_time = time.monotonic()
+            self._pip_list_lower = [pkg.lower() for pkg in self._pip_list_cache]
+        if self._pkg_dialog is None:
+            self._pkg_dialog = self._build_packages_dialog()
+        self._pkg_list.setUpdatesEnabled(False)
+        self._pkg_list.clear()
+        self._pkg_list.addItems(self._pip_list_cache)
+        self._pkg_list.setUpdatesEnabled(True)
+        self._pkg_search.clear()
+        self._pkg_dialog.exec_()
+
+    def _build_packages_dialog(self) -> QDialog:
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Installed Packages")
+        dialog.setGeometry(200, 200, 400, 400)
+        layout = QVBoxLayout(dialog)
+        layout.setSpacing(6)
+
+        search_bar = QLineEdit()
+        search_bar.setPlaceholderText("Search packages...")
+        search_bar.setStyleSheet(f"""
+            background-color: {Config.COLORS["line_number_bg"]};
+            color: {Config.COLORS["text"]};
+            padding: 6px;
+            border: 1px solid {Config.COLORS["secondary_bg"]};
+            border-radius: 4px;
+        """)
+        layout.addWidget(search_bar)
+
+        package_list = QListWidget()
+        package_list.setUniformItemSizes(True)
+        package_list.setStyleSheet(f"""
+            QListWidget {{
                 background-color: {Config.COLORS["line_number_bg"]};
                 color: {Config.COLORS["text"]};
-                padding: 6px;
                 border: 1px solid {Config.COLORS["secondary_bg"]};
                 border-radius: 4px;
-            """)
-            layout.addWidget(search_bar)
-
-            package_list = QListWidget()
-            package_list.setStyleSheet(f"""
-                QListWidget {{
-                    background-color: {Config.COLORS["line_number_bg"]};
-                    color: {Config.COLORS["text"]};
-                    border: 1px solid {Config.COLORS["secondary_bg"]};
-                    border-radius: 4px;
-                    padding: 4px;
-                }}
-                QListWidget::item {{
-                    padding: 6px;
-                }}
-                QListWidget::item:hover {{
-                    background-color: {Config.COLORS["secondary_bg"]};
-                }}
-                QListWidget::item:selected {{
-                    background-color: {Config.COLORS["accent"]};
-                    color: {Config.COLORS["background"]};
-                }}
-            """)
-            for pkg in packages:
-                if pkg.strip():
-                    QListWidgetItem(pkg.strip(), package_list)
-            layout.addWidget(package_list)
-
-            search_bar.textChanged.connect(
-                lambda text: [package_list.item(i).setHidden(text.lower() not in package_list.item(i).text().lower())
-                              for i in range(package_list.count())]
-            )
+                padding: 4px;
+            }}
+            QListWidget::item {{
+                padding: 6px;
+            }}
+            QListWidget::item:hover {{
+                background-color: {Config.COLORS["secondary_bg"]};
+            }}
+            QListWidget::item:selected {{
+                background-color: {Config.COLORS["accent"]};
+                color: {Config.COLORS["background"]};
+            }}
+        """)
+        layout.addWidget(package_list)
+
+        search_bar.textChanged.connect(self._filter_packages)
 
-            close_btn = QPushButton("Close")
-            close_btn.setStyleSheet(Config.BUTTON_STYLE)
-            close_btn.clicked.connect(dialog.accept)
-            layout.addWidget(close_btn)
+        close_btn = QPushButton("Close")
+        close_btn.setStyleSheet(Config.BUTTON_STYLE)
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn)
 
-            dialog.exec_()
-        except subprocess.CalledProcessError as e:
-            QMessageBox.warning(self, "Error", f"Failed to list packages: {str(e)}")
+        self._pkg_search = search_bar
+        self._pkg_list = package_list
+        return dialog
+
+    def _filter_packages(self, text: str) -> None:
+        needle = text.lower()
+        package_list = self._pkg_list
+        package_list.setUpdatesEnabled(False)
+        for i, name in enumerate(self._pip_list_lower):
+            package_list.item(i).setHidden(needle not in name)
+        package_list.setUpdatesEnabled(True)
 
     def install_package(self, package_name: str) -> None:
         if self.installer and self.installer.isRunning():
             self.installer.stop()
         self.console.write(f"\nInstalling {package_name}...\n")
-        self.installer = PackageInstaller(package_name, self.console)
-        self.installer.output_ready.connect(self.console.write)
-        self.installer.finished.connect(lambda success: self._on_installation_finished(success, package_name))
-        self.installer.start()
-
-    def _on_installation_finished(self, success: bool, package_name: str) -> None:
+        if self.installer is None:
+            self.installer = PackageInstaller()
+            self.installer.output_ready.connect(self.console.write)
+            self.installer.finished.connect(self._on_installation_finished)
+        self.installer.install(package_name)
+
+    def _on_installation_finished(self, success: bool) -> None:
+        package_name = self.installer.package_name
         msg = f"Package '{package_name}' {'installed successfully' if success else 'installation failed'}"
+        if success:
+            self._pip_list_cache = None
+        self.console.flush()
         (QMessageBox.information if success else QMessageBox.warning)(self, "Installation", msg)
         self.console.write("\n>>> ")
-        if self.installer:
-            self.installer.deleteLater()
-            self.installer = None
 
     def format_code(self) -> None:
         self.code_editor.format_code()
@@ -1348,7 +1826,16 @@ class PythonIDE(QMainWindow):
         self.warning_count_label.setText(f"{warnings}")
 
     def closeEvent(self, event) -> None:
+        self.shutdown(QDeadlineTimer(Config.SHUTDOWN_TIMEOUT))
+        super().closeEvent(event)
+
+    def shutdown(self, deadline: QDeadlineTimer) -> None:
+        """Stop this window and its children's threads within one shared deadline"""
+        if self._shut_down:
+            return
+        self._shut_down = True
         for window in self.child_windows[:]:
+            window.shutdown(deadline)
             window.close()
         self.child_windows.clear()
 
@@ -1357,18 +1844,24 @@ class PythonIDE(QMainWindow):
             self.auto_save_timer.deleteLater()
 
         if self.interpreter and self.interpreter.isRunning():
-            self.interpreter.stop()
+            self.interpreter.stop(deadline.remainingTime())
 
         if self.installer and self.installer.isRunning():
-            self.installer.stop()
+            self.installer.stop(deadline.remainingTime())
+
+        if self.bolt_ai:
+            self.bolt_ai.stop(deadline.remainingTime())
 
         if self.sidebar:
             self.sidebar.cleanup()
 
-        super().closeEvent(event)
+        self.settings.sync()
 
 class Sidebar:
     """Sidebar class managing toggle functionality"""
+    _TIP_SHOW = "Show Bolt AI"
+    _TIP_HIDE = "Hide Bolt AI"
+
     def __init__(self, parent: PythonIDE):
         self.parent = parent
         self.sidebar_visible = False
@@ -1377,31 +1870,56 @@ class Sidebar:
 
     def _setup_ui(self) -> None:
         self.toggle_button = QPushButton()
-        self.toggle_button.setIcon(QIcon("images/bolt.png"))
+        self.toggle_button.setIcon(Icons.get("images/bolt.png"))
         self.toggle_button.setFixedSize(45, 45)
         self.toggle_button.setIconSize(QSize(40, 40))
         self.toggle_button.setStyleSheet(Config.BOLT_BUTTON_STYLE)
         self.toggle_button.clicked.connect(self._toggle_sidebar)
-        self.toggle_button.setToolTip("Show Bolt AI")
+        self.toggle_button.setToolTip(self._TIP_SHOW)
 
     def _toggle_sidebar(self) -> None:
         self.sidebar_visible = not self.sidebar_visible
-        splitter = self.parent.centralWidget().layout().itemAt(1).widget()
+        if self.sidebar_visible and self.parent.sidebar_content is None:
+            self.parent._build_sidebar()
+        splitter = self.parent.content_splitter
+        splitter.setUpdatesEnabled(False)
         self.parent.sidebar_content.setVisible(self.sidebar_visible)
-        self.toggle_button.setToolTip("Hide Bolt AI" if self.sidebar_visible else "Show Bolt AI")
-        splitter.setSizes([250 if self.sidebar_visible else 0, splitter.width()])
+        self.toggle_button.setToolTip(self._TIP_HIDE if self.sidebar_visible else self._TIP_SHOW)
+        if self.sidebar_visible and self.parent.isVisible() and not self.parent.isMinimized():
+            self._resize_panes()
+        splitter.setUpdatesEnabled(True)
+
+    def _resize_panes(self) -> None:
+        if not self.sidebar_visible:
+            return
+        splitter = self.parent.content_splitter
+        total = splitter.width()
+        if total <= 0:
+            QTimer.singleShot(0, self._resize_panes)
+            return
+        sidebar_width = Config.SIDEBAR_WIDTH
+        sizes = [sidebar_width, total - sidebar_width]
+        if splitter.sizes() != sizes:
+            splitter.setSizes(sizes)
 
     def cleanup(self) -> None:
         if self.toggle_button:
+            self.toggle_button.blockSignals(True)
+            self.toggle_button.disconnect()
             self.toggle_button.deleteLater()
             self.toggle_button = None
 
+def _excepthook(exc_type, exc_value, exc_tb) -> None:
+    print(f"Unhandled error: {str(exc_value)}")
+    sys.__excepthook__(exc_type, exc_value, exc_tb)
+
 if __name__ == "__main__":
-    try:
-        app = QApplication(sys.argv)
-        ide = PythonIDE()
-        ide.show()
-        sys.exit(app.exec_())
-    except Exception as e:
-        print(f"Failed to start application: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+    sys.excepthook = _excepthook
+    QApplication.setAttribute(Qt.AA_CompressHighFrequencyEvents, True)
+    QApplication.setAttribute(Qt.AA_CompressTabletEvents, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+    ide = PythonIDE()
+    ide.show()
+    sys.exit(app.exec_())
\ No newline at end of file
@@ -1,35 +1,166 @@
+import json
+import os
+import queue
+import re
+from collections import OrderedDict
+from html import escape
+from pathlib import Path
+from string import Template
 import requests
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QLineEdit,
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTextBrowser, QLineEdit,
                              QPushButton, QApplication, QHBoxLayout)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QTextCursor, QClipboard, QTextFormat, QFont, QPalette, QColor
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QDeadlineTimer
+from PyQt5.QtGui import QTextCursor, QClipboard, QFont, QPalette, QColor, QTextCharFormat
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+CACHE_PATH = Path.home() / ".jaxpy" / "bolt_cache.json"
+# A fenced code block: optional language line, then the code up to the closing fence (or end of text)
+_CODE_BLOCK_RE = re.compile(r"```(?:([^\s`]*)[^\n`]*\n)?(.*?)(?:```|\Z)", re.DOTALL)
+
+_CODE_BLOCK_TEMPLATE = Template("""    <table style='width: 100%; margin: 8px 0;'>
+        <tr>
+            <td style='
+                background-color: #2A2B2E;
+                color: #D4D4D4;
+                font-family: Consolas, monospace;
+                padding: 12px;
+                border: 1px solid #353535;
+                border-radius: 6px;
+                white-space: pre-wrap;
+                word-wrap: break-word;'>$code</td>
+            <td style='
+                width: 90px;
+                vertical-align: top;
+                background-color: #353535;
+                border: 1px solid #FFC61A;
+                padding: 6px;'>
+                <a href='copy:$button_id' style='
+                    color: #ECDC51;
+                    font-family: Consolas;
+                    font-weight: 600;
+                    text-decoration: none;'>Copy Code</a>
+            </td>
+        </tr>
+    </table>
+""")
+
+class PromptCache:
+    """Exact-match prompt/response cache, persisted between sessions"""
+    MAX_ENTRIES = 256
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = path
+        self.exact: OrderedDict = OrderedDict()
+        try:
+            self.exact.update(json.loads(self.path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        # Whitespace is collapsed but case is kept: identifiers in code questions are case-sensitive
+        return " ".join(prompt.split())
+
+    def lookup(self, prompt: str):
+        key = self._normalize(prompt)
+        response = self.exact.get(key)
+        if response is not None:
+            self.exact.move_to_end(key)
+        return response
+
+    def insert(self, prompt: str, response: str):
+        self.exact[self._normalize(prompt)] = response
+        while len(self.exact) > self.MAX_ENTRIES:
+            self.exact.popitem(last=False)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write beside the cache and swap it in, so a crash mid-write cannot truncate it
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            temp_path.write_text(json.dumps(self.exact), encoding="utf-8")
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
 
 class BoltAIWorker(QThread):
-    """Worker thread to handle AI responses from Ollama via API"""
-    response_ready = pyqtSignal(str)
+    """Long-lived worker thread that streams AI responses from Ollama via API"""
+    token_ready = pyqtSignal(int, str)
+    response_ready = pyqtSignal(int, str)
 
-    def __init__(self, prompt: str):
+    def __init__(self):
         super().__init__()
-        self.prompt = prompt
+        self.prompts: queue.Queue = queue.Queue()
+        # Id of the newest submitted prompt; a stream for any other id is stale and stops
+        self._latest_id = 0
+        self.cache = PromptCache()
+        # Keep-alive connection pool to the Ollama server, used only by this worker's thread
+        self.session = requests.Session()
+        self._stopping = False
+
+    def submit(self, request_id: int, prompt: str):
+        """Queue a prompt, cancelling whatever is still streaming"""
+        self._latest_id = request_id
+        self.prompts.put((request_id, prompt))
+
+    def stop(self, timeout_ms: int = 2000):
+        deadline = QDeadlineTimer(max(timeout_ms, 0))
+        self._stopping = True
+        self.prompts.put(None)
+        if not self.wait(deadline.remainingTime()):
+            self.terminate()
+            self.wait(deadline.remainingTime())
+        self.session.close()
 
     def run(self):
+        while not self._stopping:
+            item = self.prompts.get()
+            # Only the newest prompt matters; older ones were superseded
+            while item is not None and not self.prompts.empty():
+                item = self.prompts.get_nowait()
+            if item is None:
+                continue
+            self._stream_one(*item)
+
+    def _stream_one(self, request_id: int, prompt: str):
+        cached = self.cache.lookup(prompt)
+        if cached is not None:
+            self.response_ready.emit(request_id, cached)
+            return
         try:
-            url = "http://localhost:11434/api/generate"
             payload = {
                 "model": "qwen2.5-coder:3b",
-                "prompt": self.prompt,
-                "stream": False
+                "prompt": prompt,
+                "stream": True
             }
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                self.response_ready.emit(result["response"])
-            else:
-                self.response_ready.emit(f"Error: API returned status {response.status_code} - {response.text}")
+            with self.session.post(OLLAMA_URL, json=payload, stream=True, timeout=(5, None)) as response:
+                if response.status_code != 200:
+                    self.response_ready.emit(
+                        request_id, f"Error: API returned status {response.status_code} - {response.text}")
+                    return
+                tokens = []
+                # iter_lines reassembles NDJSON lines that arrive split across chunks
+                for line in response.iter_lines():
+                    if self._stopping or request_id != self._latest_id:
+                        return
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    token = chunk.get("response", "")
+                    if token:
+                        tokens.append(token)
+                        self.token_ready.emit(request_id, token)
+                    if chunk.get("done"):
+                        break
+                response_text = "".join(tokens)
+                self.cache.insert(prompt, response_text)
+                self.response_ready.emit(request_id, response_text)
         except requests.exceptions.ConnectionError:
-            self.response_ready.emit("Error: Could not connect to Ollama server. Is it running?")
+            self.response_ready.emit(request_id, "Error: Could not connect to Ollama server. Is it running?")
         except Exception as e:
-            self.response_ready.emit(f"Error: {str(e)}")
+            self.response_ready.emit(request_id, f"Error: {str(e)}")
 
 class BoltAI(QWidget):
     """Bolt AI chat interface for coding assistance with enhanced UI"""
@@ -58,13 +189,89 @@ class BoltAI(QWidget):
             box-shadow: inset 0 2px 4px rgba(0, 0, 0, 0.2);
         }
     """
+    CHAT_STYLE = """
+        QTextEdit {
+            border: 1px solid #353535;
+            border-radius: 6px;
+            padding: 8px;
+            selection-background-color: #FFC61A;
+            selection-color: #1E1F22;
+        }
+    """
+    INPUT_STYLE = """
+        QLineEdit {
+            background-color: #2A2B2E;
+            color: #D4D4D4;
+            border: 1px solid #353535;
+            padding: 6px;
+            border-radius: 4px;
+        }
+        QLineEdit:focus {
+            border-color: #FFC61A;
+            box-shadow: 0 0 4px rgba(255, 198, 26, 0.5);
+        }
+    """
+    PANEL_STYLE = """
+        QWidget {
+            background: #1E1F22;
+        }
+        QScrollBar:vertical, QScrollBar:horizontal {
+            border: none;
+            background: #2A2B2E;
+            width: 10px;
+            height: 10px;
+            margin: 0;
+        }
+        QScrollBar::handle:vertical, QScrollBar::handle:horizontal {
+            background: #353535;
+            border-radius: 5px;
+        }
+        QScrollBar::handle:vertical:hover, QScrollBar::handle:horizontal:hover {
+            background: #FFC61A;
+        }
+        QScrollBar::add-line, QScrollBar::sub-line {
+            background: none;
+        }
+    """
+    COPIED_TEXT = "Copied to clipboard!"
+    _font = None
+    _palette = None
+
+    @classmethod
+    def _chat_font(cls) -> QFont:
+        if cls._font is None:
+            cls._font = QFont("Consolas", 10)
+            cls._font.setFixedPitch(True)
+        return cls._font
+
+    @classmethod
+    def _chat_palette(cls) -> QPalette:
+        if cls._palette is None:
+            cls._palette = QPalette()
+            cls._palette.setColor(QPalette.Base, QColor("#1E1F22"))
+            cls._palette.setColor(QPalette.Text, QColor("#D4D4D4"))
+        return cls._palette
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
-        self.worker: BoltAIWorker = None
+        self.worker = BoltAIWorker()
+        self.worker.token_ready.connect(self.append_token)
+        self.worker.response_ready.connect(self.display_response)
+        self.worker.start()
+        self._request_id = 0
+        self._code_block_count = 0
+        self._code_by_id = {}
         self.clipboard = QApplication.clipboard()
+        self._stream_block = None
+        self._token_format = QTextCharFormat()
+        self._token_format.setForeground(QColor("#D4D4D4"))
+        self._pending_tokens = []
+        self._token_timer = QTimer(self)
+        self._token_timer.setInterval(16)
+        self._token_timer.timeout.connect(self._flush_tokens)
         self._setup_ui()
+        self._end_cursor = QTextCursor(self.chat_display.document())
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -72,24 +279,13 @@ class BoltAI(QWidget):
         layout.setSpacing(6)
 
         # Chat display
-        self.chat_display = QTextEdit()
+        self.chat_display = QTextBrowser()
         self.chat_display.setReadOnly(True)
-        font = QFont("Consolas", 10)
-        font.setFixedPitch(True)
-        self.chat_display.setFont(font)
-        palette = QPalette()
-        palette.setColor(QPalette.Base, QColor("#1E1F22"))
-        palette.setColor(QPalette.Text, QColor("#D4D4D4"))
-        self.chat_display.setPalette(palette)
-        self.chat_display.setStyleSheet("""
-            QTextEdit {
-                border: 1px solid #353535;
-                border-radius: 6px;
-                padding: 8px;
-                selection-background-color: #FFC61A;
-                selection-color: #1E1F22;
-            }
-        """)
+        self.chat_display.setOpenLinks(False)
+        self.chat_display.anchorClicked.connect(self._on_anchor)
+        self.chat_display.setFont(self._chat_font())
+        self.chat_display.setPalette(self._chat_palette())
+        self.chat_display.setStyleSheet(self.CHAT_STYLE)
         self.chat_display.append(
             "<span style='color: #ECDC51; font-weight: 600;'>Bolt AI:</span> "
             "Hello! I'm here to help with coding questions and provide code examples."
@@ -103,20 +299,8 @@ class BoltAI(QWidget):
         # Input field
         self.input_field = QLineEdit()
         self.input_field.setPlaceholderText("Ask Bolt AI about coding...")
-        self.input_field.setFont(font)
-        self.input_field.setStyleSheet("""
-            QLineEdit {
-                background-color: #2A2B2E;
-                color: #D4D4D4;
-                border: 1px solid #353535;
-                padding: 6px;
-                border-radius: 4px;
-            }
-            QLineEdit:focus {
-                border-color: #FFC61A;
-                box-shadow: 0 0 4px rgba(255, 198, 26, 0.5);
-            }
-        """)
+        self.input_field.setFont(self._chat_font())
+        self.input_field.setStyleSheet(self.INPUT_STYLE)
         self.input_field.returnPressed.connect(self.send_message)
         input_layout.addWidget(self.input_field)
 
@@ -129,28 +313,7 @@ class BoltAI(QWidget):
         # Add input layout to main layout
         layout.addLayout(input_layout)
 
-        self.setStyleSheet("""
-            QWidget {
-                background: #1E1F22;
-            }
-            QScrollBar:vertical, QScrollBar:horizontal {
-                border: none;
-                background: #2A2B2E;
-                width: 10px;
-                height: 10px;
-                margin: 0;
-            }
-            QScrollBar::handle:vertical, QScrollBar::handle:horizontal {
-                background: #353535;
-                border-radius: 5px;
-            }
-            QScrollBar::handle:vertical:hover, QScrollBar::handle:horizontal:hover {
-                background: #FFC61A;
-            }
-            QScrollBar::add-line, QScrollBar::sub-line {
-                background: none;
-            }
-        """)
+        self.setStyleSheet(self.PANEL_STYLE)
 
     def send_message(self):
         message = self.input_field.text().strip()
@@ -159,94 +322,102 @@ class BoltAI(QWidget):
 
         # Display user message
         self.chat_display.append(
-            f"<span style='color: #FFC61A; font-weight: 600;'>You:</span> {message}"
+            f"<span style='color: #FFC61A; font-weight: 600;'>You:</span> {escape(message, quote=False)}"
         )
         self.input_field.clear()
 
-        # Start worker thread to get AI response
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker.wait()
+        # Hand the prompt to the worker; any reply still streaming is cancelled
+        self._pending_tokens.clear()
+        self.chat_display.append("<span style='color: #ECDC51; font-weight: 600;'>Bolt AI:</span> ")
+        self._stream_block = self.chat_display.document().lastBlock()
+        self._request_id += 1
+        self.worker.submit(self._request_id, message)
 
-        self.worker = BoltAIWorker(message)
-        self.worker.response_ready.connect(self.display_response)
-        self.worker.start()
+    def stop(self, timeout_ms: int = 2000):
+        """Shut the worker thread down; call before the widget is destroyed"""
+        self.worker.stop(timeout_ms)
+
+    def append_token(self, request_id: int, token: str):
+        """Show a streamed token as plain text at the end of the chat"""
+        if request_id != self._request_id:
+            return
+        self._pending_tokens.append(token)
+        if not self._token_timer.isActive():
+            self._token_timer.start()
 
-    def display_response(self, response: str):
+    def _flush_tokens(self):
+        """Write the tokens gathered since the last tick in one insert"""
+        self._token_timer.stop()
+        if not self._pending_tokens:
+            return
+        self.chat_display.setUpdatesEnabled(False)
+        self._end_cursor.movePosition(QTextCursor.End)
+        self._end_cursor.insertText("".join(self._pending_tokens), self._token_format)
+        self._pending_tokens.clear()
+        self.chat_display.setUpdatesEnabled(True)
+        self.chat_display.moveCursor(QTextCursor.End)
+
+    def display_response(self, request_id: int, response: str):
         """Display AI response with code blocks and copy buttons"""
-        parts = response.split("```")
-        formatted_response = "<span style='color: #ECDC51; font-weight: 600;'>Bolt AI:</span> "
-
-        for i, part in enumerate(parts):
-            if i % 2 == 0:  # Text outside code blocks
-                formatted_response += part.replace("\n", "<br>")
-            else:  # Code inside code blocks
-                language = ""
-                code_lines = part.strip().splitlines()
-                if code_lines and not code_lines[0].startswith(" "):
-                    language = code_lines[0].strip()
-                    code = "\n".join(code_lines[1:]) if len(code_lines) > 1 else ""
-                else:
-                    code = part
-
-                button_id = f"copy_{id(self)}_{i}"
-                formatted_response += f"""
-                    <table style='width: 100%; margin: 8px 0;'>
-                        <tr>
-                            <td style='
-                                background-color: #2A2B2E;
-                                color: #D4D4D4;
-                                font-family: Consolas, monospace;
-                                padding: 12px;
-                                border: 1px solid #353535;
-                                border-radius: 6px;
-                                white-space: pre-wrap;
-                                word-wrap: break-word;'>{code}</td>
-                            <td style='width: 90px; vertical-align: top; padding-left: 6px;'>
-                                <input type='button' value='Copy Code' id='{button_id}' 
-                                    style='
-                                        background-color: #353535;
-                                        color: #ECDC51;
-                                        border: 1px solid #FFC61A;
-                                        padding: 6px 12px;
-                                        border-radius: 6px;
-                                        font-family: Consolas;
-                                        font-weight: 600;
-                                        cursor: pointer;
-                                        transition: all 0.2s;'
-                                    onmouseover='this.style.backgroundColor="#FFC61A"; this.style.color="#1E1F22";'
-                                    onmouseout='this.style.backgroundColor="#353535"; this.style.color="#ECDC51";'>
-                            </td>
-                        </tr>
-                    </table>
-                """
-                QTimer.singleShot(100, lambda c=code, b=button_id: self._bind_copy_button(c, b))
-
-        self.chat_display.append(formatted_response)
+        if request_id != self._request_id:
+            return
+        self._token_timer.stop()
+        self._pending_tokens.clear()
+        if self._stream_block is not None:
+            # Replace the plain streamed text with the formatted response
+            cursor = QTextCursor(self.chat_display.document())
+            cursor.setPosition(max(self._stream_block.position() - 1, 0))
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+            self._stream_block = None
+        chunks = ["<span style='color: #ECDC51; font-weight: 600;'>Bolt AI:</span> "]
+        pos = 0
+
+        for match in _CODE_BLOCK_RE.finditer(response):
+            # Text outside code blocks
+            chunks.append(escape(response[pos:match.start()], quote=False).replace("\n", "<br>"))
+            pos = match.end()
+            code = match.group(2).lstrip("\n").rstrip()
+            self._code_block_count += 1
+            button_id = f"copy_{id(self)}_{self._code_block_count}"
+            chunks.append(_CODE_BLOCK_TEMPLATE.substitute(code=escape(code, quote=False), button_id=button_id))
+            self._code_by_id[button_id] = code
+
+        # Text after the last code block
+        chunks.append(escape(response[pos:], quote=False).replace("\n", "<br>"))
+        self._end_cursor.movePosition(QTextCursor.End)
+        self._end_cursor.insertBlock()
+        self._end_cursor.insertHtml("".join(chunks))
         self.chat_display.moveCursor(QTextCursor.End)
-        if self.worker:
-            self.worker.deleteLater()
-            self.worker = None
-
-    def _bind_copy_button(self, code: str, button_id: str):
-        """Bind the copy button to copy the code to clipboard"""
-        cursor = self.chat_display.textCursor()
-        cursor.movePosition(QTextCursor.Start)
-        while cursor.movePosition(QTextCursor.NextBlock):
-            block_text = cursor.block().text()
-            if button_id in block_text:
-                self.chat_display.setTextCursor(cursor)
-                self.chat_display.document().find(f"id='{button_id}'").charFormat().setProperty(
-                    QTextFormat.UserProperty, lambda: self._copy_to_clipboard(code))
-                break
+
+    def _on_anchor(self, url):
+        """Copy the code block behind a 'Copy Code' link"""
+        code = self._code_by_id.get(url.path()) if url.scheme() == "copy" else None
+        if code is not None:
+            self._copy_to_clipboard(code)
 
     def _copy_to_clipboard(self, code: str):
         """Copy the code to the clipboard"""
         self.clipboard.setText(code.strip())
-        self.chat_display.append(
-            "<span style='color: #FFC61A; font-style: italic;'>Copied to clipboard!</span>"
-        )
-        QTimer.singleShot(2000, lambda: self.chat_display.undo())
+        cursor = QTextCursor(self.chat_display.document())
+        if self._stream_block is not None:
+            # Keep the note above a reply that is still streaming in
+            cursor.setPosition(self._stream_block.position() - 1)
+        else:
+            cursor.movePosition(QTextCursor.End)
+        cursor.insertBlock()
+        cursor.insertHtml(f"<span style='color: #FFC61A; font-style: italic;'>{self.COPIED_TEXT}</span>")
+        block = cursor.block()
+        QTimer.singleShot(2000, lambda: self._remove_feedback(block))
+
+    def _remove_feedback(self, block):
+        """Remove the copy note block and the separator in front of it"""
+        if not block.isValid() or block.text() != self.COPIED_TEXT:
+            return
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() - 1)
+        cursor.setPosition(block.position() + block.length() - 1, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
 
 if __name__ == "__main__":
     from PyQt5.QtWidgets import QApplication
@@ -254,5 +425,6 @@ if __name__ == "__main__":
 
     app = QApplication(sys.argv)
     window = BoltAI()
+    app.aboutToQuit.connect(window.stop)
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file